@@ -1,79 +1,146 @@
-import matplotlib.pyplot as plt
+import os
+import time
+import matplotlib
+import numpy as np
+import orjson
 import requests
-from collections import defaultdict
-from tabulate import tabulate
 
+PLOT_DIR = os.environ.get('PLOT_DIR')  # when set, plots are written here as PNGs instead of shown
+if PLOT_DIR:
+    matplotlib.use('Agg')  # headless backend - must be selected before pyplot is imported
+import matplotlib.pyplot as plt
+
+SESSION = requests.Session()  # keeps the connection to the node alive between queries
+CACHE_TTL = 30  # seconds a fetched aggregation snapshot is reused for
+_CACHE = {}  # conn -> (fetch time, rows)
+
+
+def get_data(conn: str, ttl: float = CACHE_TTL):
+    """
+    aggregations from the node - a snapshot fetched less than ttl seconds ago is reused instead of querying again
+    :args:
+        conn:str - node IP:port
+        ttl:float - maximum age (seconds) of a cached snapshot this call accepts, 0 always fetches
+    :return:
+        the parsed rows - a cached snapshot is shared by every call that reuses it, so callers must not modify it
+    """
+    now = time.monotonic()
+    cached = _CACHE.get(conn)
+    if cached is not None and now - cached[0] < ttl:
+        return cached[1]
 
-def get_data(conn: str):
     headers = {
         'command': 'get aggregations where format=json',
         'User-Agent': 'AnyLog/1.23'
     }
 
     try:
-        response = requests.get(url=f"http://{conn}", headers=headers)
+        response = SESSION.get(url=f"http://{conn}", headers=headers)
         response.raise_for_status()
-        return response.json()
+        data = orjson.loads(response.content)
     except Exception as error:
         raise requests.exceptions.RequestException(f'Failed to GET from {conn} (Error: {error})')
 
+    _CACHE[conn] = (now, data)
+    return data
+
 
 def extract_data(raw_data: list):
-    data = {}
-    for row in raw_data:
-        table = f"{row['dbms']}.{row['table']}"
-        column = row['value_column']
-        interval = row['interval_id']
-
-        if table not in data:
-            data[table] = {}
-        if interval not in data[table]:
-            data[table][interval] = []
-
-        data[table][interval].append({
-            'column': column,
-            'events_per_second': row['events_sec'],
-            'count': row['count']
-        })
+    tables = [f"{row['dbms']}.{row['table']}" for row in raw_data]
+    columns = [row['value_column'] for row in raw_data]
+    # string fields are sized from the data - a fixed width would silently truncate long names and merge their groups
+    dtype = np.dtype([
+        ('table', f"U{max(map(len, tables), default=1)}"),
+        ('column', f"U{max(map(len, columns), default=1)}"),
+        ('interval', 'i4'),
+        ('eps', 'f8'),
+        ('count', 'f8')
+    ])
+    return np.fromiter(
+        ((table, column, row['interval_id'], row['events_sec'], row['count'])
+         for table, column, row in zip(tables, columns, raw_data)),
+        dtype=dtype,
+        count=len(raw_data)
+    )
+
+
+def group_reduce(keys: np.ndarray, mins: np.ndarray, maxs: np.ndarray = None, sums: np.ndarray = None,
+                 sizes: np.ndarray = None) -> dict:
+    """
+    min / max / sum / size grouped by keys - raw rows are treated as groups of size 1, so the output of one
+    call can be fed back in on a coarser key
+    :args:
+        keys:np.ndarray - grouping key per row (plain or structured)
+        mins:np.ndarray - values (or partial minimums) to reduce, one column per metric when 2-D
+        maxs:np.ndarray - partial maximums, defaults to mins
+        sums:np.ndarray - partial sums, defaults to mins
+        sizes:np.ndarray - partial group sizes, defaults to 1 per row
+    :return:
+        unique keys (in order of first appearance) with their min / max / sum / size
+    """
+    maxs = mins if maxs is None else maxs
+    sums = mins if sums is None else sums
+    sizes = np.ones(len(keys), dtype=np.int64) if sizes is None else sizes
+
+    groups, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    # np.unique sorts its groups - renumber them by first appearance so output follows the order the node returned
+    appearance = np.argsort(first)
+    rank = np.empty_like(appearance)
+    rank[appearance] = np.arange(len(appearance))
+    groups, inverse = groups[appearance], rank[inverse.reshape(-1)]
+
+    order = np.argsort(inverse, kind='stable')
+    counts = np.bincount(inverse, minlength=len(groups))
+    offsets = np.cumsum(counts) - counts
+
+    return {
+        'keys': groups,
+        'min': np.minimum.reduceat(mins[order], offsets),
+        'max': np.maximum.reduceat(maxs[order], offsets),
+        'sum': np.add.reduceat(sums[order], offsets),
+        'size': np.add.reduceat(sizes[order], offsets)
+    }
 
-    return data
 
+def rollup(stats: dict, fields):
+    return group_reduce(stats['keys'][fields], stats['min'], stats['max'], stats['sum'], stats['size'])
 
-def aggregate_stats(data: dict):
-    table_column_stats = defaultdict(lambda: defaultdict(lambda: {'events': [], 'counts': []}))
 
-    for table, intervals in data.items():
-        for interval, entries in intervals.items():
-            for entry in entries:
-                column = entry['column']
-                eps = entry['events_per_second']
-                cnt = entry['count']
+def interval_stats(data: np.ndarray) -> dict:
+    """
+    eps / count stats at the finest level (table, column, interval) - coarser levels are rolled up from this
+    :args:
+        data:np.ndarray - rows from extract_data
+    :return:
+        group_reduce result with eps and count as columns 0 and 1
+    """
+    values = np.column_stack((data['eps'], data['count']))
+    return group_reduce(data[['table', 'column', 'interval']], values)
 
-                table_column_stats[table][column]['events'].append(float(eps))
-                table_column_stats[table][column]['counts'].append(float(cnt))
 
+def aggregate_stats(stats: dict):
     result = {}
-
-    for table, columns in table_column_stats.items():
-        result[table] = {}
-        for column, metrics in columns.items():
-            e = metrics['events']
-            c = metrics['counts']
-
-            if e and c:
-                result[table][column] = {
-                    'events_per_second': {
-                        'min': min(e),
-                        'max': max(e),
-                        'avg': round(sum(e) / len(e), 3)
-                    },
-                    'count': {
-                        'min': min(c),
-                        'max': max(c),
-                        'avg': round(sum(c) / len(c), 3)
-                    },
-                    'intervals': len(e)  # assume 1 data point per interval
-                }
+    if not len(stats['keys']):
+        return result
+
+    stats = rollup(stats, ['table', 'column'])
+    avgs = np.round(stats['sum'] / stats['size'][:, None], 3).tolist()
+    mins, maxs, sizes = stats['min'].tolist(), stats['max'].tolist(), stats['size'].tolist()
+
+    for i, (table, column) in enumerate(stats['keys'].tolist()):
+        result.setdefault(table, {})[column] = {
+            'events_per_second': {
+                'min': mins[i][0],
+                'max': maxs[i][0],
+                'avg': avgs[i][0]
+            },
+            'count': {
+                'min': mins[i][1],
+                'max': maxs[i][1],
+                'avg': avgs[i][1]
+            },
+            'intervals': sizes[i]  # assume 1 data point per interval
+        }
 
     return result
 
@@ -100,8 +167,8 @@ def print_column_stats(stats: dict):
 
     summary_row = [
         "Summary", "",
-        "", "", f"{round(sum(eps_avg_list) / len(eps_avg_list), 2):,}",
-        "", "", f"{round(sum(count_avg_list) / len(count_avg_list), 2):,}"
+        "", "", sum(eps_avg_list) / len(eps_avg_list),
+        "", "", sum(count_avg_list) / len(count_avg_list)
 
     ]
     rows.append(summary_row)
@@ -113,33 +180,42 @@ def print_column_stats(stats: dict):
 
     ]
 
-    print(tabulate(rows, headers=headers, floatfmt=".2f"))
+    print(format_table(rows, headers))
 
-def plot_table_interval_stats(table: str, data: dict):
-    if table not in data:
-        print(f"[ERROR] Table '{table}' not found in data.")
-        return
 
-    interval_stats = defaultdict(lambda: {'eps': [], 'count': 0})
+def format_table(rows: list, headers: list) -> str:
+    """
+    render rows the way tabulate's "simple" format does (first column left-aligned, the rest right-aligned,
+    floats as .2f) - formats every cell once and pads against precomputed widths
+    :args:
+        rows:list - table rows
+        headers:list - column names
+    :return:
+        table as a single string
+    """
+    cells = [[f"{value:.2f}" if isinstance(value, float) else str(value) for value in row] for row in rows]
+    widths = [max(len(headers[i]) + 2, *(len(line[i]) for line in cells)) for i in range(len(headers))]
+    row_format = "  ".join([f"{{:<{widths[0]}}}", *(f"{{:>{width}}}" for width in widths[1:])])
+
+    lines = [row_format.format(*headers), "  ".join("-" * width for width in widths)]
+    lines.extend(row_format.format(*line) for line in cells)
+    return "\n".join(lines)
 
-    for interval, entries in data[table].items():
-        for entry in entries:
-            interval_stats[interval]['eps'].append(entry['events_per_second'])
-        interval_stats[interval]['count'] = len(entries)
+
+def plot_table_interval_stats(table: str, stats: dict, out_dir: str = PLOT_DIR):
+    in_table = stats['keys']['table'] == table
+    if not in_table.any():
+        print(f"[ERROR] Table '{table}' not found in data.")
+        return
 
     # Prepare data for plotting
-    intervals = sorted(interval_stats.keys())
-    eps_min, eps_max, eps_avg = [], [], []
-    avg_points = []
-
-    for interval in intervals:
-        eps_list = interval_stats[interval]['eps']
-        if not eps_list:
-            continue
-        eps_min.append(min(eps_list))
-        eps_max.append(max(eps_list))
-        eps_avg.append(sum(eps_list) / len(eps_list))
-        avg_points.append(interval_stats[interval]['count'])
+    stats = rollup({key: value[in_table] for key, value in stats.items()}, 'interval')
+    stats = {key: value[np.argsort(stats['keys'], kind='stable')] for key, value in stats.items()}
+    intervals = stats['keys'].tolist()
+    eps_min = stats['min'][:, 0].tolist()
+    eps_max = stats['max'][:, 0].tolist()
+    eps_avg = (stats['sum'][:, 0] / stats['size']).tolist()
+    avg_points = stats['size'].tolist()
 
     x = range(len(intervals))
     width = 0.25
@@ -167,8 +243,12 @@ def plot_table_interval_stats(table: str, data: dict):
     ax1.legend()
     ax1.grid(True)
 
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    if out_dir:
+        fig.savefig(os.path.join(out_dir, f"{table}.png"), dpi=100)
+    else:
+        plt.show()
+    plt.close(fig)
 
     # # --- Line Chart ---
     # fig, ax2 = plt.subplots(figsize=(12, 4))
@@ -186,7 +266,7 @@ def plot_table_interval_stats(table: str, data: dict):
 def main():
     conn = '10.0.0.220:32149'
     raw = get_data(conn)
-    structured = extract_data(raw)
+    structured = interval_stats(extract_data(raw))
     stats = aggregate_stats(structured)
 
     print("\n=== Per Table Per Column Stats ===")
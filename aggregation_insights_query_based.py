@@ -1,10 +1,13 @@
 import datetime
-import json
+from functools import lru_cache
 import matplotlib.pyplot as plt
+import orjson
 import requests
 from tabulate import tabulate
 import matplotlib.ticker as ticker
 
+SESSION = requests.Session()  # keeps the connection to the node alive between queries
+
 
 def get_data(conn: str, db_name: str, table_name: str):
     headers = {
@@ -14,21 +17,26 @@ def get_data(conn: str, db_name: str, table_name: str):
     }
 
     try:
-        response = requests.get(url=f"http://{conn}", headers=headers)
+        response = SESSION.get(url=f"http://{conn}", headers=headers)
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     except Exception as error:
         raise requests.exceptions.RequestException(f'Failed to GET from {conn} (Error: {error})')
 
 
+@lru_cache(maxsize=8192)
+def parse_timestamp(value: str) -> datetime.datetime:
+    # interval boundaries repeat between rows (max_ts of one minute is often min_ts of the next)
+    return datetime.datetime.strptime(value, '%Y-%m-%d %H:%M:%S.%f')
+
+
 def extract_data(raw_data: list, db_name: str, table_name: str):
     data = []
     interval = 0
 
     for row in raw_data:
         interval += 1
-        time_diff = datetime.datetime.strptime(row['max_ts'], '%Y-%m-%d %H:%M:%S.%f') - datetime.datetime.strptime(
-            row['min_ts'], '%Y-%m-%d %H:%M:%S.%f')
+        time_diff = parse_timestamp(row['max_ts']) - parse_timestamp(row['min_ts'])
         seconds = float(time_diff.total_seconds())
         eps = round(row['row_count'] / seconds) if seconds > 0 else 0
         data.append({
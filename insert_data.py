@@ -1,16 +1,28 @@
 import argparse
-import datetime
-import random
+import itertools
 import re
+import sys
 import time
-import json
+import numpy as np
+import orjson
 import urllib3
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Union, List, Tuple
 
-CONNS = []
-TOTAL_ROWS = 0
-http = urllib3.PoolManager()
+CONNS = ()
+POOLS = {}
+HEADERS = {}
+NEXT_CONN = itertools.count()  # next() on a count is atomic under the GIL, so no lock is needed
+TIMEOUT = urllib3.Timeout(connect=2.0, read=10.0)
+
+SIZE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)([A-Za-z]+)")
+SIZE_MULTIPLIER = {
+    "B": 1,
+    "KB": 1 << 10,
+    "MB": 1 << 20,
+    "GB": 1 << 30,
+    "TB": 1 << 40
+}
 
 
 def seconds_to_hhmmss(seconds):
@@ -26,101 +38,129 @@ def calculate_row_count(num_columns: int, size_str: Union[str, int]) -> Tuple[Li
     if isinstance(size_str, int) or (isinstance(size_str, str) and size_str.isdigit()):
         return column_names, int(size_str)
 
-    match = re.fullmatch(r"(\d+(?:\.\d+)?)([A-Za-z]+)", size_str.strip())
+    match = SIZE_PATTERN.fullmatch(size_str.strip())
     if not match:
         raise ValueError("Invalid size format. Use digits or suffix with B/KB/MB/GB/TB.")
 
     size_num = float(match.group(1))
     size_unit = match.group(2).upper()
 
-    size_multiplier = {
-        "B": 1,
-        "KB": 1024,
-        "MB": 1024 ** 2,
-        "GB": 1024 ** 3,
-        "TB": 1024 ** 4
-    }
-
-    if size_unit not in size_multiplier:
+    if size_unit not in SIZE_MULTIPLIER:
         raise ValueError(f"Unsupported unit: {size_unit}. Use B, KB, MB, GB, or TB.")
 
     row_size_bytes = num_columns * 8 + 8
-    total_bytes = size_num * size_multiplier[size_unit]
+    total_bytes = size_num * SIZE_MULTIPLIER[size_unit]
 
     return column_names, int(total_bytes // row_size_bytes)
 
 
-def generate_row(columns: list) -> dict:
-    return {
-        'timestamp': datetime.datetime.now(tz=datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
-        **{column: round(random.random() * random.randint(1, 999), random.randint(0, 2)) for column in columns}
-    }
+def utc_timestamps(batch_size: int) -> List[str]:
+    # one clock read per batch; rows are 1µs apart so timestamps stay unique and ordered within the batch
+    start = np.datetime64(time.time_ns() // 1000, 'us')
+    return np.datetime_as_string(start + np.arange(batch_size), unit='us', timezone='UTC').tolist()
+
+
+def generate_batch(columns: list, batch_size: int, rng: np.random.Generator) -> List[dict]:
+    # same distribution as round(random() * randint(1, 999), randint(0, 2)), drawn for the whole batch at once
+    shape = (batch_size, len(columns))
+    values = rng.random(shape) * rng.integers(1, 1000, size=shape)
+    scale = 10.0 ** rng.integers(0, 3, size=shape)
+    values = np.round(values * scale) / scale
+
+    keys = ('timestamp', *columns)  # built once per batch, not per row
+    rows = zip(utc_timestamps(batch_size), values.tolist())
+    return [dict(zip(keys, (timestamp, *row))) for timestamp, row in rows]
 
 
 def get_conn():
-    return random.choice(CONNS)
+    # round-robin so batches spread evenly over the operators
+    return CONNS[next(NEXT_CONN) % len(CONNS)]
 
 
 def release_conn(conn):
     pass  # No-op
 
 
-def send_request(conn, dbms, table, data):
-    global TOTAL_ROWS
-    headers = {
-        'type': 'json',
-        'dbms': dbms,
-        'mode': 'streaming',
-        'Content-Type': 'text/plain',
-        'table': table
-    }
-    url = f'http://{conn}'
+def get_headers(dbms: str, table: str) -> dict:
+    headers = HEADERS.get((dbms, table))
+    if headers is None:
+        headers = HEADERS.setdefault((dbms, table), {
+            'type': 'json',
+            'dbms': dbms,
+            'mode': 'streaming',
+            'Content-Type': 'text/plain',
+            'table': table
+        })
+    return headers
+
+
+def send_request(conn, dbms, table, data) -> int:
     try:
-        response = http.request(
+        response = POOLS[conn].urlopen(
             method='PUT',
-            url=url,
-            headers=headers,
-            body=json.dumps(data)
+            url='/',
+            headers=get_headers(dbms, table),
+            body=orjson.dumps(data)
         )
         if 200 <= response.status < 300:
-            TOTAL_ROWS += len(data)
+            return len(data)
     except Exception:
         pass
+    return 0
 
 
-def insert_data(dbms: str, table: str, payload: list):
+def insert_data(dbms: str, table: str, payload: list) -> int:
     conn = get_conn()
     try:
-        send_request(conn, dbms, table, payload)
+        return send_request(conn, dbms, table, payload)
     finally:
         release_conn(conn)
 
 
-def worker(stop_time: float, total_rows: int, rps: float, columns: List[str], dbms: str, table: str):
-    interval = 1.0  # seconds
-
-    while time.time() < stop_time and TOTAL_ROWS < total_rows:
-        start = time.time()
-
-        if rps == float('inf'):
-            # Unlimited mode: just send a fixed-size large batch repeatedly
-            batch_size = 1000
-        else:
-            batch_size = int(rps * interval)
-
-        batch = [generate_row(columns) for _ in range(batch_size)]
-        insert_data(dbms, table, batch)
-
-        elapsed = time.time() - start
-        sleep_time = interval - elapsed
-        if rps != float('inf') and sleep_time > 0:
-            time.sleep(sleep_time)
+def worker(index: int, threads: int, start_ns: int, stop_ns: Union[int, float], total_rows: int, rps: float,
+           columns: List[str], dbms: str, table: str) -> int:
+    inserted = 0  # rows inserted by this worker only, summed by main once all workers finish
+    rng = np.random.default_rng()  # per worker - a shared Generator serializes threads on its internal lock
 
+    if rps == float('inf'):
+        # Unlimited mode: just send a fixed-size large batch repeatedly
+        rows_per_batch = 1000
+        row_ns = 0
+    else:
+        rows_per_batch = max(1, int(rps * 0.1))  # about 100ms worth of rows
+        row_ns = 1_000_000_000 / rps
+
+    cap_at_stop = bool(row_ns) and stop_ns != float('inf')  # loop-invariant, checked once
+
+    # the deadline advances by each batch's worth of rows; workers' rows are phased a fraction of a row apart
+    # (one even stream) and their sends a fraction of a batch apart (interleaved PUTs)
+    phase_ns = index * row_ns / threads
+    offset_ns = index * row_ns * rows_per_batch / threads
+    next_send_ns = start_ns
+    while inserted < total_rows:
+        if row_ns:
+            if next_send_ns + phase_ns >= stop_ns:
+                break
+            sleep_ns = min(next_send_ns + offset_ns, stop_ns) - time.monotonic_ns()
+            if sleep_ns > 0:
+                time.sleep(sleep_ns / 1_000_000_000)
+        elif time.monotonic_ns() >= stop_ns:
+            break
+
+        batch_size = min(rows_per_batch, total_rows - inserted)
+        if cap_at_stop:
+            # only the rows scheduled before the end of the run
+            batch_size = min(batch_size, int(-(-(stop_ns - next_send_ns - phase_ns) // row_ns)))
+        batch = generate_batch(columns, batch_size, rng)
+        inserted += insert_data(dbms, table, batch)
+        next_send_ns += batch_size * row_ns
+
+    return inserted
 
 
 def main():
     global CONNS
-    global TOTAL_ROWS
+    global POOLS
 
     parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     parser.add_argument('conn', type=str, help='Comma-separated connections (host:port)')
@@ -131,14 +171,29 @@ def main():
     parser.add_argument('--max-threads', type=int, default=8, help='Max number of threads')
     parser.add_argument('--dbms', type=str, default='test', help='Database name')
     parser.add_argument('--table', type=str, default='rand_data', help='Table name')
+    parser.add_argument('--switch-interval', type=float, default=None,
+                        help='GIL switch interval in seconds (CPython default 0.005); larger values let a worker '
+                             'finish more of a batch before yielding')
     args = parser.parse_args()
 
-    CONNS = args.conn.split(',')
+    if args.switch_interval:
+        sys.setswitchinterval(args.switch_interval)
+
+    CONNS = tuple(args.conn.split(','))
     threads = min(args.max_threads, len(CONNS) * 2) if args.max_threads < 8 else max(args.max_threads, len(CONNS) * 2)
+    # one pool per operator, with a reusable keep-alive connection per thread; a failed PUT is simply not counted
+    # (see send_request), so urllib3's retry bookkeeping is disabled
+    POOLS = {
+        conn: urllib3.connection_from_url(f'http://{conn}', maxsize=threads, block=False, retries=False,
+                                          timeout=TIMEOUT)
+        for conn in CONNS
+    }
     columns, total_rows = (
         calculate_row_count(args.num_columns, args.size)
         if args.run_time == 0 else ([f'column_{i + 1}' for i in range(args.num_columns)], float('inf'))
     )
+    # shared read-only by every worker for the whole run
+    columns = tuple(columns)
 
     rps = args.hz * args.num_columns if args.hz > 0 else float('inf')
     if rps == float('inf'):
@@ -149,24 +204,34 @@ def main():
     print(f"🧱 Columns: {args.num_columns}")
     print(f"🎯 Target: {args.size if args.run_time == 0 else f'{args.run_time}s duration'}\n")
 
-    start_time = time.time()
-    stop_time = start_time + args.run_time if args.run_time > 0 else float('inf')
+    # split the row target between workers so each one only tracks its own share
+    if total_rows == float('inf'):
+        shares = [total_rows] * threads
+    else:
+        share, extra = divmod(total_rows, threads)
+        shares = [share + (1 if i < extra else 0) for i in range(threads)]
+
+    start_time = time.perf_counter()
+    start_ns = time.monotonic_ns()  # one schedule origin for every worker
+    stop_ns = start_ns + int(args.run_time * 1_000_000_000) if args.run_time > 0 else float('inf')
 
     with ThreadPoolExecutor(max_workers=threads) as executor:
         futures = [
-            executor.submit(worker, stop_time, total_rows, rps / threads, columns, args.dbms, args.table)
-            for _ in range(threads)
+            executor.submit(worker, i, threads, start_ns, stop_ns, shares[i], rps / threads, columns, args.dbms,
+                            args.table)
+            for i in range(threads)
         ]
+        total_inserted = 0
         for future in as_completed(futures):
             try:
-                future.result()
+                total_inserted += future.result()
             except Exception as e:
                 print(f"❌ Thread error: {e}")
 
-    elapsed = round(time.time() - start_time, 2)
+    elapsed = round(time.perf_counter() - start_time, 2)
 
-    print(f"\n✅ Done. Inserted {TOTAL_ROWS:,} rows in {seconds_to_hhmmss(elapsed)}")
-    print(f"⚡ Throughput: {int(TOTAL_ROWS / elapsed):,} rows/sec\n")
+    print(f"\n✅ Done. Inserted {total_inserted:,} rows in {seconds_to_hhmmss(elapsed)}")
+    print(f"⚡ Throughput: {int(total_inserted / elapsed):,} rows/sec\n")
 
 
 if __name__ == "__main__":
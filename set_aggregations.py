@@ -1,6 +1,15 @@
 import argparse
+import re
+import orjson
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
+MAX_WORKERS = 16  # concurrent requests against the node
+
+SESSION = requests.Session()  # keeps the connection to the node alive between commands
+SESSION.mount('http://', HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS))
+WHITESPACE_PATTERN = re.compile(r"\s+")
 
 
 def get_tables(conn:str, db_name:str)->dict:
@@ -22,33 +31,39 @@ def get_tables(conn:str, db_name:str)->dict:
     }
 
     try:
-        response = requests.get(url=f"http://{conn}", headers=headers)
+        response = SESSION.get(url=f"http://{conn}", headers=headers)
         response.raise_for_status()
     except Exception as error:
         raise error
-    for row in response.json():
+    for row in orjson.loads(response.content):
         if 'table' in row and db_name in row['table']:
             tables[row['table'].split('.')[-1]] = {}
     return tables
 
 
-def get_columns(conn:str, db_name:str, tables:dict):
-    timestamp_column = 'insert_timestamp'
-    command = f'get columns where dbms={db_name} and table=%s and format=json'
+def fetch_columns(conn:str, command:str)->dict:
     headers = {
-        'command': None,
+        'command': command,
         'User-Agent': 'AnyLog/1.23'
     }
 
-    for table in tables:
-        headers['command'] = command % table
-        try:
-            response = requests.get(url=f"http://{conn}", headers=headers)
-            response.raise_for_status()
-        except Exception as error:
-            raise error
-        data = response.json()
+    try:
+        response = SESSION.get(url=f"http://{conn}", headers=headers)
+        response.raise_for_status()
+    except Exception as error:
+        raise error
+    return orjson.loads(response.content)
+
+
+def get_columns(conn:str, db_name:str, tables:dict):
+    timestamp_column = 'insert_timestamp'
+    command = f'get columns where dbms={db_name} and table=%s and format=json'
 
+    # fetch every table's columns concurrently, then process them in table order
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        responses = list(executor.map(lambda table: fetch_columns(conn=conn, command=command % table), tables))
+
+    for table, data in zip(tables, responses):
         for column in data:
             if column not in ['row_id', 'insert_timestamp', 'tsd_name', 'tsd_id']:
                 if data[column].strip().split(' ', 1)[0] == 'timestamp':
@@ -67,15 +82,13 @@ def build_command(db_name:str, table_name:str, interval:int, time_frame:str, tim
         intervals={interval} and 
         time={time_frame}  and
         time_column={time_column} and
-        value_column={value_column}""".replace("\n"," ")
-    while "  " in command:
-        command = command.replace("  ", " ")
+        value_column={value_column}"""
 
-    return command
+    return WHITESPACE_PATTERN.sub(" ", command)
 
 def post_command(conn:str, command:str):
     try:
-        response = requests.post(url=f'http://{conn}', headers={'command': command, 'User-Agent': 'AnyLog/1.23'})
+        response = SESSION.post(url=f'http://{conn}', headers={'command': command, 'User-Agent': 'AnyLog/1.23'})
         response.raise_for_status()
     except Exception as error:
         raise requests.exceptions.RequestException(f'Failed to execute GET against {conn} (Error: {error})')
@@ -100,6 +113,7 @@ def main():
     if not args.table:
         tables = get_columns(conn=args.conn, db_name=args.dbms, tables=tables)
 
+    commands = []
     for table in tables:
         timestamp_column = next((k for k, v in tables[table].items() if v == 'timestamp'), None)
         for column in tables[table]:
@@ -107,7 +121,11 @@ def main():
                 command = build_command(db_name=args.dbms, table_name=table, interval=args.interval,
                                         time_frame=args.time_frame, time_column=timestamp_column, value_column=column)
                 print(command)
-                post_command(conn=args.conn, command=command)
+                commands.append(command)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # consuming the results re-raises the first failed post
+        list(executor.map(lambda command: post_command(conn=args.conn, command=command), commands))
 
     # for i in range(args.num_columns):
     #     column_name = f'column_{i+1}' if args.column_as_table is False else 'value'